@@ -8,15 +8,26 @@ DATA_FILE = "workorders.json"
 
 # Global list of work orders (each is a dict: id, customer, item, status, total)
 work_orders = []
+# Index of the same dicts by ID, for O(1) lookups
+work_orders_by_id = {}
+# ID to give the next new work order (persisted in workorders.json)
+next_work_order_id = 1
 
 
 def load_work_orders():
     """Load work orders from workorders.json at startup."""
-    global work_orders
+    global work_orders, work_orders_by_id, next_work_order_id
+    next_work_order_id = None
     if os.path.exists(DATA_FILE):
         try:
             with open(DATA_FILE, "r") as f:
-                work_orders = json.load(f)
+                data = json.load(f)
+            # File is {"next_id": ..., "orders": [...]}; older files are a bare list of orders
+            if isinstance(data, list):
+                work_orders = data
+            else:
+                work_orders = data.get("orders", [])
+                next_work_order_id = data.get("next_id")
             # Ensure each work order has notification_sent (for backward compatibility)
             for wo in work_orders:
                 if "notification_sent" not in wo:
@@ -25,23 +36,33 @@ def load_work_orders():
             work_orders = []
     else:
         work_orders = []
+    work_orders_by_id = {wo["id"]: wo for wo in work_orders}
+    if next_work_order_id is None:
+        next_work_order_id = max(work_orders_by_id, default=0) + 1
 
 
 def save_work_orders():
     """Save work orders to workorders.json after changes."""
+    # Write to a temp file and rename it over the original, so a crash mid-write
+    # can't leave an empty or truncated workorders.json
+    tmp_file = DATA_FILE + ".tmp"
     try:
-        with open(DATA_FILE, "w") as f:
-            json.dump(work_orders, f, indent=2)
+        with open(tmp_file, "w") as f:
+            json.dump({"next_id": next_work_order_id, "orders": work_orders}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, DATA_FILE)
     except OSError:
         print("Error: Could not save work orders to file.")
 
 
 def add_work_order():
     """Add a new work order to the system."""
+    global next_work_order_id
     print("\n--- Add Work Order ---")
     
-    # Generate ID as max existing ID + 1 (works after loading from file)
-    work_order_id = max((wo["id"] for wo in work_orders), default=0) + 1
+    # Take the next ID from the persisted counter
+    work_order_id = next_work_order_id
     
     # Get customer name
     customer = input("Enter customer name: ").strip()
@@ -81,6 +102,8 @@ def add_work_order():
     }
     
     work_orders.append(work_order)
+    work_orders_by_id[work_order_id] = work_order
+    next_work_order_id += 1
     save_work_orders()
     print(f"✓ Work order #{work_order_id} created successfully!")
 
@@ -114,11 +137,7 @@ def finish_work_order():
         return
     
     # Find the work order by ID
-    work_order = None
-    for wo in work_orders:
-        if wo["id"] == work_order_id:
-            work_order = wo
-            break
+    work_order = work_orders_by_id.get(work_order_id)
     
     if work_order is None:
         print(f"Error: Work order #{work_order_id} not found.")
@@ -3,104 +3,454 @@ Spokely Work Order Tracking — Web Prototype (production-shaped)
 Single route / returns HTML: work orders, event log (last 10), and optional SMS banner.
 """
 
-import json
+import atexit
 import os
-from datetime import datetime
-from flask import Flask, request, redirect, url_for
+import threading
+import time
+from datetime import datetime, timezone
+from html import escape as _html_escape
+import orjson
+from flask import Flask, Response, request, redirect, stream_with_context, url_for
 
 app = Flask(__name__)
 DATA_FILE = "workorders.json"
 SNAPSHOT_FILE = "last_snapshot.json"
-EVENT_LOG_FILE = "event_log.json"
+EVENT_LOG_FILE = "event_log.jsonl"
+# Once the active event log passes this size it is renamed to event_log.<ns>.jsonl and a new one started.
+EVENT_LOG_MAX_BYTES = 1_000_000
+
+# In-memory copies of the parsed JSON files, keyed by file mtime so requests only
+# hit disk when a file actually changed on disk.
+_cache_lock = threading.Lock()
+_wo_cache = {"mtime": 0, "data": None}
+_snapshot_cache = {"mtime": 0, "data": {}}
+# Serializes read-modify-write cycles on the data files across server threads.
+_mutation_lock = threading.RLock()
+
+
+def _load_json(f):
+    return orjson.loads(f.read())
+
+
+def _load_cached(path, cache, load=_load_json, default=list):
+    """Return parsed JSON from path (opened in binary mode for load), re-reading only when its
+    mtime has changed. Returns default() if the file is missing or unreadable.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return default()
+    with _cache_lock:
+        if cache["mtime"] == mtime:
+            return cache["data"]
+        try:
+            with open(path, "rb") as f:
+                data = load(f)
+        except (orjson.JSONDecodeError, OSError):
+            data = default()
+        cache["mtime"] = mtime
+        cache["data"] = data
+        return data
+
+
+def _store_cached(path, cache, data):
+    """Record data just written to path so the next read skips the disk."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = 0
+    with _cache_lock:
+        cache["mtime"] = mtime
+        cache["data"] = data
+
+
+def _invalidate_cached(cache):
+    """Force the next read to go to disk (e.g. after a failed write)."""
+    with _cache_lock:
+        cache["mtime"] = 0
+
+
+# Long-lived fds, one per (path, flags), so hot paths skip the open/close pair per call.
+# Only used for the append-only event log, which is never replaced in place; rotation
+# closes its fds. Removing or replacing the log outside the app needs a restart, since
+# the cached fds would keep pointing at the old file.
+_fds = {}
+_fd_lock = threading.Lock()
+
+
+def _get_fd(path, flags):
+    """Return a cached fd for path opened with flags, opening it on first use. Raises OSError."""
+    fd = _fds.get((path, flags))
+    if fd is None:
+        with _fd_lock:
+            fd = _fds.get((path, flags))
+            if fd is None:
+                fd = os.open(path, flags, 0o644)
+                _fds[(path, flags)] = fd
+    return fd
+
+
+def _close_fds(path=None):
+    """Close cached fds for path (all of them if path is None)."""
+    with _fd_lock:
+        for key in [k for k in _fds if path is None or k[0] == path]:
+            try:
+                os.close(_fds.pop(key))
+            except OSError:
+                pass
+
+
+atexit.register(_close_fds)
+
+
+def commit(changes, events=()):
+    """Apply several file updates with one directory fsync.
+    changes: list of (path, bytes); each payload goes to path + ".tmp", is fsync'd, and is
+    atomically renamed over path, so a crash leaves either the old or the new file, never a truncated one.
+    events: event dicts appended (and fsync'd) to the event log in a single write, before the renames.
+    The containing directory is fsync'd once after all renames. Raises OSError on failure, after
+    removing any leftover .tmp files.
+    The files are not updated as one atomic unit: if a rename fails after the events were appended,
+    the events stay in the log while the old snapshot remains, so the next GET re-detects and
+    re-logs them. Events are therefore at-least-once.
+    """
+    try:
+        for path, payload in changes:
+            with open(path + ".tmp", "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+        if events:
+            _append_events(events, sync=True)
+        for path, _ in changes:
+            os.replace(path + ".tmp", path)
+    except OSError:
+        for path, _ in changes:
+            try:
+                os.unlink(path + ".tmp")
+            except OSError:
+                pass
+        raise
+    dirs = {os.path.dirname(os.path.abspath(path)) for path, _ in changes}
+    if events:
+        dirs.add(os.path.dirname(os.path.abspath(EVENT_LOG_FILE)))
+    for d in dirs:
+        dir_fd = os.open(d, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def _json_bytes(obj):
+    """Compact JSON for the data files (machine-read, so no indent)."""
+    return orjson.dumps(obj)
+
+
+def pretty_dump(obj):
+    """Indented JSON string, for inspecting data by hand while debugging."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+
+
+def _atomic_write_json(path, obj):
+    """Durably replace path with obj as JSON (see commit()). Raises OSError on failure."""
+    commit([(path, _json_bytes(obj))])
 
 
 # -----------------------------------------------------------------------------
 # Data adapter: work orders source (JSON now; Lightspeed API later)
 # -----------------------------------------------------------------------------
 
+def _workorders_state(orders, next_id=None):
+    """In-memory form of workorders.json: orders list, id -> order index, and the id counter.
+    Also stamps each order with a derived "_finished" flag so hot paths don't re-normalize status.
+    """
+    if next_id is None:
+        next_id = max((wo.get("id", 0) for wo in orders), default=0) + 1
+    by_id = {}
+    for wo in orders:
+        wo["_finished"] = _status_finished(wo.get("status"))
+        by_id[wo.get("id")] = wo
+    return {"next_id": next_id, "orders": orders, "by_id": by_id}
+
+
+def _load_workorders_file(f):
+    data = _load_json(f)
+    # Older files are a bare list of orders with no stored counter.
+    if isinstance(data, list):
+        return _workorders_state(data)
+    return _workorders_state(data.get("orders", []), data.get("next_id"))
+
+
+def load_workorders_state():
+    """Return the cached workorders.json state ({next_id, orders, by_id}), reloading if it changed."""
+    return _load_cached(DATA_FILE, _wo_cache, load=_load_workorders_file, default=lambda: _workorders_state([]))
+
+
 def get_workorders(source="json"):
     """Load work orders. source='json' reads workorders.json.
     TODO: replace with Lightspeed API later — e.g. fetch from API, normalize to same list-of-dict shape (id, customer, item, status, total, ...).
     """
     if source == "json":
-        if os.path.exists(DATA_FILE):
-            try:
-                with open(DATA_FILE, "r") as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, OSError):
-                return []
-        return []
+        return load_workorders_state()["orders"]
     # TODO: elif source == "lightspeed": ... API call
     return []
 
 
-def save_workorders(work_orders):
-    """Persist work orders to workorders.json."""
+def save_workorders(work_orders, next_id=None):
+    """Persist work orders (and the next id counter) to workorders.json and refresh the in-memory cache."""
+    state = _workorders_state(work_orders, next_id)
     try:
-        with open(DATA_FILE, "w") as f:
-            json.dump(work_orders, f, indent=2)
+        # "_finished" is derived on load; keep it out of the file.
+        orders = [{k: v for k, v in wo.items() if k != "_finished"} for wo in work_orders]
+        _atomic_write_json(DATA_FILE, {"next_id": state["next_id"], "orders": orders})
     except OSError:
-        pass
+        # Callers mutate the cached list in place; drop it so the next read reloads from disk.
+        _invalidate_cached(_wo_cache)
+        return
+    _store_cached(DATA_FILE, _wo_cache, state)
+
+
+def _snapshot_map(work_orders):
+    """Snapshot form of work orders: {str(id): finished?}, all the diff needs.
+    Keys are strings so the map round-trips through JSON unchanged.
+    """
+    return {str(wo.get("id")): wo["_finished"] for wo in work_orders}
+
+
+def _load_snapshot_file(f):
+    data = _load_json(f)
+    # Older snapshots stored the full work order list.
+    if isinstance(data, list):
+        return {str(wo.get("id")): _status_finished(wo.get("status")) for wo in data}
+    return data
 
 
 def load_snapshot():
-    """Load previous work order snapshot for diffing."""
-    if os.path.exists(SNAPSHOT_FILE):
-        try:
-            with open(SNAPSHOT_FILE, "r") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, OSError):
-            pass
-    return []
+    """Load previous work order snapshot ({str(id): finished?}) for diffing."""
+    return _load_cached(SNAPSHOT_FILE, _snapshot_cache, load=_load_snapshot_file, default=dict)
 
 
-def save_snapshot(work_orders):
-    """Persist current work orders as snapshot for next request."""
+def save_snapshot(status_map, events=()):
+    """Persist current {str(id): finished?} snapshot for next request.
+    Any pending `events` are appended to the event log in the same commit().
+    """
     try:
-        with open(SNAPSHOT_FILE, "w") as f:
-            json.dump(work_orders, f, indent=2)
+        commit([(SNAPSHOT_FILE, _json_bytes(status_map))], events=events)
     except OSError:
-        pass
+        return
+    _store_cached(SNAPSHOT_FILE, _snapshot_cache, status_map)
 
 
 # -----------------------------------------------------------------------------
-# Event log: timestamp, workorder_id, event_type, message
+# Event log: JSON Lines, one event per line (timestamp, workorder_id, event_type, message).
+# timestamp is integer nanoseconds since the epoch (UTC); older entries hold an ISO string.
+# Append-only: each event is a single O_APPEND write, independent of log size.
+# Rotated by size into event_log.<ns>.jsonl segments so the active file stays small.
 # -----------------------------------------------------------------------------
 
-def _read_event_log():
-    if os.path.exists(EVENT_LOG_FILE):
+_EVENT_APPEND_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+_TAIL_BLOCK_SIZE = 4096
+# Held while appending/rotating and while reading across segments, so a rotation can't
+# close a cached fd that another thread is using or move the file mid-read.
+_event_log_lock = threading.RLock()
+# Size of the active log, tracked from our own writes (None until the append fd is opened).
+_event_log_size = None
+
+
+def _iter_jsonl(lines):
+    """Decode JSON Lines, skipping blank or partially written lines."""
+    for line in lines:
+        if not line.strip():
+            continue
         try:
-            with open(EVENT_LOG_FILE, "r") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, OSError):
-            pass
-    return []
+            yield orjson.loads(line)
+        except orjson.JSONDecodeError:
+            continue
 
 
-def _write_event_log(events):
+def _rotated_segments():
+    """Paths of rotated event log segments, newest first."""
+    directory, name = os.path.split(EVENT_LOG_FILE)
+    root, ext = os.path.splitext(name)
+    segments = []
     try:
-        with open(EVENT_LOG_FILE, "w") as f:
-            json.dump(events, f, indent=2)
+        names = os.listdir(directory or ".")
     except OSError:
-        pass
+        return []
+    for entry in names:
+        stamp = entry[len(root) + 1:-len(ext)] if entry.startswith(root + ".") and entry.endswith(ext) else ""
+        if stamp.isdigit():
+            segments.append((int(stamp), os.path.join(directory, entry)))
+    return [path for _, path in sorted(segments, reverse=True)]
 
 
-def append_event(workorder_id, event_type, message):
-    entry = {
-        "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+def _event_log_fd():
+    """Append-mode fd for the event log, opened once and reused across requests."""
+    return _get_fd(EVENT_LOG_FILE, _EVENT_APPEND_FLAGS)
+
+
+def _make_event(workorder_id, event_type, message):
+    return {
+        "timestamp": time.time_ns(),
         "workorder_id": workorder_id,
         "event_type": event_type,
         "message": message,
     }
-    events = _read_event_log()
-    events.append(entry)
-    _write_event_log(events)
+
+
+def _append_events(entries, sync=False):
+    """Append entries to the event log with a single write (fsync'd if sync), rotating
+    the log once it passes EVENT_LOG_MAX_BYTES. Raises OSError if the write fails.
+    """
+    global _event_log_size
+    with _event_log_lock:
+        fd = _event_log_fd()
+        if _event_log_size is None:
+            _event_log_size = os.fstat(fd).st_size
+        _event_log_size += os.write(fd, b"".join(orjson.dumps(e) + b"\n" for e in entries))
+        if sync:
+            os.fsync(fd)
+        if _event_log_size > EVENT_LOG_MAX_BYTES:
+            # Housekeeping only: the events are already written, so a failed rotation must not
+            # fail the caller (e.g. abort commit() before the snapshot advances). Retried next append.
+            try:
+                _rotate_event_log()
+            except OSError:
+                pass
+
+
+def _rotate_event_log():
+    """Move the active log aside as event_log.<ns>.jsonl; the next append starts a new file."""
+    root, ext = os.path.splitext(EVENT_LOG_FILE)
+    global _event_log_size
+    os.rename(EVENT_LOG_FILE, f"{root}.{time.time_ns()}{ext}")
+    _close_fds(EVENT_LOG_FILE)
+    _event_log_size = None
+
+
+def append_event(workorder_id, event_type, message):
+    try:
+        _append_events([_make_event(workorder_id, event_type, message)])
+    except OSError:
+        pass
+
+
+def _tail_lines(path, n):
+    """Return the last n events in path, reading backwards from EOF in fixed-size blocks."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return []
+    try:
+        return _tail_fd(fd, n)
+    finally:
+        os.close(fd)
+
+
+def _tail_fd(fd, n):
+    """_tail_lines on an open fd, using positional reads."""
+    if n <= 0:
+        return []
+    try:
+        pos = os.fstat(fd).st_size
+        buf = b""
+        newlines = 0
+        # n complete lines need n + 1 newlines (the one before the first line) unless we hit BOF.
+        while pos > 0 and newlines <= n:
+            step = min(_TAIL_BLOCK_SIZE, pos)
+            pos -= step
+            block = os.pread(fd, step, pos)
+            newlines += block.count(b"\n")
+            buf = block + buf
+    except OSError:
+        return []
+    lines = buf.splitlines()
+    if pos > 0:
+        lines = lines[1:]  # first line is cut off mid-way
+    return list(_iter_jsonl(lines[-n:]))
 
 
 def get_recent_events(limit=10):
-    """Return last `limit` events (newest last for display)."""
-    events = _read_event_log()
-    return events[-limit:] if len(events) > limit else events
+    """Return last `limit` events (newest last for display).
+    Reads the active log through a cached fd, falling back to rotated segments only if it
+    holds fewer than `limit` events.
+    """
+    with _event_log_lock:
+        try:
+            events = _tail_fd(_get_fd(EVENT_LOG_FILE, os.O_RDONLY), limit)
+        except OSError:
+            events = []
+        if len(events) < limit:
+            for path in _rotated_segments():
+                events = _tail_lines(path, limit - len(events)) + events
+                if len(events) >= limit:
+                    break
+        return events
+
+
+def _event_ns(ts):
+    """Event timestamp as epoch ns; legacy entries store "%Y-%m-%dT%H:%M:%SZ" strings."""
+    if isinstance(ts, int):
+        return ts
+    dt = datetime.strptime(ts, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    return int(dt.timestamp()) * 1_000_000_000
+
+
+def _line_ts(line):
+    """Timestamp (epoch ns) of one log line, or None if it can't be decoded."""
+    try:
+        return _event_ns(orjson.loads(line)["timestamp"])
+    except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _bisect_log_by_ts(path, target_ts):
+    """Byte offset of the first event in path with timestamp >= target_ts (file size if none).
+    Binary search over file offsets, O(log size) seeks; relies on the log being appended
+    in timestamp order. Undecodable lines are treated as older than target_ts. Raises OSError.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+
+        def line_from(pos):
+            # First complete line starting at or after pos: (start offset, line bytes).
+            if pos == 0:
+                f.seek(0)
+            else:
+                f.seek(pos - 1)
+                f.readline()
+            return f.tell(), f.readline()
+
+        lo, hi = 0, size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            _, line = line_from(mid)
+            ts = _line_ts(line) if line else None
+            if not line or (ts is not None and ts >= target_ts):
+                hi = mid
+            else:
+                lo = mid + 1
+        return line_from(lo)[0]
+
+
+def get_events_since(ts):
+    """Return events with timestamp >= ts (epoch ns), oldest first.
+    Walks segments newest to oldest, stopping at the first one that starts before ts.
+    """
+    events = []
+    with _event_log_lock:
+        for path in [EVENT_LOG_FILE] + _rotated_segments():
+            try:
+                offset = _bisect_log_by_ts(path, ts)
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    events = list(_iter_jsonl(f)) + events
+            except OSError:
+                continue
+            if offset > 0:
+                break
+    return events
 
 
 # -----------------------------------------------------------------------------
@@ -112,22 +462,25 @@ def _status_finished(status):
     return (status or "").strip().lower() in ("finished", "complete", "completed")
 
 
-def detect_finished_and_notify(old_list, new_list):
-    """Compare old vs new; for any work order that became finished, log event and simulate SMS.
+def detect_finished_and_notify(old_map, new_list, events=None):
+    """Compare old snapshot ({str(id): finished?}) vs new list; for any work order that
+    became finished, log event and simulate SMS.
+    If `events` is a list, new events are collected into it for the caller to commit() instead
+    of being appended one by one.
     Returns list of (workorder_id, customer, item) that were “notified” this run (for banner).
     """
-    old_by_id = {wo.get("id"): wo for wo in (old_list or [])}
+    old_map = old_map or {}
     notified = []
     for wo in new_list or []:
         wid = wo.get("id")
-        new_finished = _status_finished(wo.get("status"))
-        old_wo = old_by_id.get(wid)
-        old_finished = _status_finished(old_wo.get("status")) if old_wo else False
-        if new_finished and not old_finished:
+        if wo["_finished"] and not old_map.get(str(wid), False):
             customer = wo.get("customer", "")
             item = wo.get("item", "")
             message = f"SMS would be sent to {customer} for work order #{wid} ({item})"
-            append_event(wid, "sms_simulated", message)
+            if events is None:
+                append_event(wid, "sms_simulated", message)
+            else:
+                events.append(_make_event(wid, "sms_simulated", message))
             # Simulate SMS: log/print (replace with Twilio later)
             print(f"[SMS simulated] {message}")
             notified.append((wid, customer, item))
@@ -138,16 +491,25 @@ def detect_finished_and_notify(old_list, new_list):
 # Single route: / — GET returns HTML; POST handles Add Work Order / Mark Finished
 # -----------------------------------------------------------------------------
 
-def _next_id(work_orders):
-    """Next work order id."""
-    return max((wo.get("id", 0) for wo in work_orders), default=0) + 1
+def _next_id(state):
+    """Next work order id, taken from the persisted counter (which is advanced)."""
+    wid = state["next_id"]
+    state["next_id"] = wid + 1
+    return wid
+
+
+def _format_timestamp(ts):
+    """Render an event timestamp (epoch ns, or a legacy ISO string) as ISO-8601 UTC."""
+    if isinstance(ts, int):
+        return datetime.fromtimestamp(ts // 1_000_000_000, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return ts
 
 
 def _escape(s):
     """Escape for HTML text content."""
     if s is None:
         return ""
-    return str(s).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+    return _html_escape(str(s), quote=True)
 
 
 @app.route("/", methods=["GET", "POST"])
@@ -163,17 +525,18 @@ def index():
             total = 0
         status = (request.form.get("status") or "in progress").strip() or "in progress"
         if customer and item:
-            work_orders = get_workorders(source="json")
-            new_wo = {
-                "id": _next_id(work_orders),
-                "customer": customer,
-                "item": item,
-                "status": status,
-                "total": total,
-                "notification_sent": False,
-            }
-            work_orders.append(new_wo)
-            save_workorders(work_orders)
+            with _mutation_lock:
+                state = load_workorders_state()
+                new_wo = {
+                    "id": _next_id(state),
+                    "customer": customer,
+                    "item": item,
+                    "status": status,
+                    "total": total,
+                    "notification_sent": False,
+                }
+                state["orders"].append(new_wo)
+                save_workorders(state["orders"], state["next_id"])
         return redirect(url_for("index"))
 
     # --- POST: Mark Finished ---
@@ -183,130 +546,171 @@ def index():
         except (TypeError, ValueError):
             wid = None
         if wid is not None:
-            work_orders = get_workorders(source="json")
-            for wo in work_orders:
-                if wo.get("id") == wid:
+            with _mutation_lock:
+                state = load_workorders_state()
+                wo = state["by_id"].get(wid)
+                if wo is not None:
                     wo["status"] = "Finished"
                     if "notification_sent" in wo:
                         wo["notification_sent"] = True
-                    break
-            save_workorders(work_orders)
+                save_workorders(state["orders"], state["next_id"])
+                _row_cache.pop(wid, None)
         return redirect(url_for("index"))
 
     # --- GET: load data, run workflow, build HTML ---
-    new_list = get_workorders(source="json")
-    old_list = load_snapshot()
-    notified = detect_finished_and_notify(old_list, new_list)
-    save_snapshot(new_list)
+    # Locked so concurrent GETs can't both see the same order as newly finished.
+    with _mutation_lock:
+        new_list = get_workorders(source="json")
+        old_map = load_snapshot()
+        pending_events = []
+        notified = detect_finished_and_notify(old_map, new_list, events=pending_events)
+        # Most GETs change nothing; only rewrite the snapshot when it would differ.
+        new_map = _snapshot_map(new_list)
+        if pending_events or new_map != old_map:
+            save_snapshot(new_map, events=pending_events)
     recent_events = get_recent_events(10)
 
-    html = [_build_page(new_list, notified, recent_events)]
-    return "\n".join(html)
-
-
-def _build_page(work_orders, notified, recent_events):
-    """Build full HTML page with embedded CSS, header, form, table, banner, event log."""
-    parts = [
-        "<!DOCTYPE html><html lang='en'><head><meta charset='UTF-8'><meta name='viewport' content='width=device-width,initial-scale=1'>",
-        "<title>Spokely Work Orders</title>",
-        "<style>",
-        "*,*::before,*::after{box-sizing:border-box;}",
-        "body{margin:0;font-family:system-ui,-apple-system,sans-serif;background:#f5f5f5;color:#222;}",
-        ".app{max-width:900px;margin:0 auto;padding:24px;}",
-        "header{background:#1a1a2e;color:#eee;padding:16px 20px;margin:-24px -24px 24px -24px;border-radius:0 0 8px 8px;}",
-        "header h1{margin:0;font-size:1.5rem;font-weight:600;}",
-        ".banner{background:#e7f3ff;border:1px solid #0066cc;border-radius:6px;padding:12px 16px;margin-bottom:20px;}",
-        ".banner strong{color:#004080;}",
-        "h2{font-size:1.1rem;color:#333;margin:0 0 12px 0;}",
-        "table{width:100%;border-collapse:collapse;background:#fff;border-radius:8px;overflow:hidden;box-shadow:0 1px 3px rgba(0,0,0,.08);}",
-        "th,td{padding:12px 16px;text-align:left;border-bottom:1px solid #eee;}",
-        "th{background:#f8f9fa;font-weight:600;color:#444;}",
-        "tr:last-child td{border-bottom:0;}",
-        ".badge{padding:4px 10px;border-radius:20px;font-size:0.85rem;font-weight:500;}",
-        ".badge.inprogress{background:#fff3cd;color:#856404;}",
-        ".badge.finished{background:#d4edda;color:#155724;}",
-        ".btn{padding:8px 14px;border-radius:6px;border:none;cursor:pointer;font-size:0.9rem;}",
-        ".btn-primary{background:#1a1a2e;color:#fff;}",
-        ".btn-primary:hover{background:#2d2d44;}",
-        ".btn-sm{padding:6px 10px;font-size:0.85rem;}",
-        ".card{background:#fff;border-radius:8px;padding:20px;margin-bottom:20px;box-shadow:0 1px 3px rgba(0,0,0,.08);}",
-        ".form-row{display:flex;flex-wrap:wrap;gap:12px;align-items:flex-end;margin-bottom:8px;}",
-        ".form-group{min-width:120px;}",
-        ".form-group label{display:block;font-size:0.85rem;color:#555;margin-bottom:4px;}",
-        ".form-group input,.form-group select{width:100%;padding:8px 10px;border:1px solid #ccc;border-radius:6px;}",
-        ".event-log{background:#f8f9fa;border:1px solid #dee2e6;border-radius:6px;padding:12px;max-height:280px;overflow-y:auto;}",
-        ".event-log ul{margin:0;padding-left:20px;}",
-        ".event-log li{margin:4px 0;font-size:0.9rem;color:#444;}",
-        ".event-log .meta{color:#666;font-size:0.8rem;}",
-        "</style>",
-        "</head><body><div class='app'>",
-        "<header><h1>Spokely Work Orders</h1></header>",
-    ]
+    return Response(stream_with_context(_iter_page(new_list, notified, recent_events)), mimetype="text/html")
+
+
+# Static page chrome, built once at import; _iter_page only renders the dynamic sections.
+_HEAD = (
+    "<!DOCTYPE html><html lang='en'><head><meta charset='UTF-8'><meta name='viewport' content='width=device-width,initial-scale=1'>"
+    "<title>Spokely Work Orders</title>"
+    "<style>"
+    "*,*::before,*::after{box-sizing:border-box;}"
+    "body{margin:0;font-family:system-ui,-apple-system,sans-serif;background:#f5f5f5;color:#222;}"
+    ".app{max-width:900px;margin:0 auto;padding:24px;}"
+    "header{background:#1a1a2e;color:#eee;padding:16px 20px;margin:-24px -24px 24px -24px;border-radius:0 0 8px 8px;}"
+    "header h1{margin:0;font-size:1.5rem;font-weight:600;}"
+    ".banner{background:#e7f3ff;border:1px solid #0066cc;border-radius:6px;padding:12px 16px;margin-bottom:20px;}"
+    ".banner strong{color:#004080;}"
+    "h2{font-size:1.1rem;color:#333;margin:0 0 12px 0;}"
+    "table{width:100%;border-collapse:collapse;background:#fff;border-radius:8px;overflow:hidden;box-shadow:0 1px 3px rgba(0,0,0,.08);}"
+    "th,td{padding:12px 16px;text-align:left;border-bottom:1px solid #eee;}"
+    "th{background:#f8f9fa;font-weight:600;color:#444;}"
+    "tr:last-child td{border-bottom:0;}"
+    ".badge{padding:4px 10px;border-radius:20px;font-size:0.85rem;font-weight:500;}"
+    ".badge.inprogress{background:#fff3cd;color:#856404;}"
+    ".badge.finished{background:#d4edda;color:#155724;}"
+    ".btn{padding:8px 14px;border-radius:6px;border:none;cursor:pointer;font-size:0.9rem;}"
+    ".btn-primary{background:#1a1a2e;color:#fff;}"
+    ".btn-primary:hover{background:#2d2d44;}"
+    ".btn-sm{padding:6px 10px;font-size:0.85rem;}"
+    ".card{background:#fff;border-radius:8px;padding:20px;margin-bottom:20px;box-shadow:0 1px 3px rgba(0,0,0,.08);}"
+    ".form-row{display:flex;flex-wrap:wrap;gap:12px;align-items:flex-end;margin-bottom:8px;}"
+    ".form-group{min-width:120px;}"
+    ".form-group label{display:block;font-size:0.85rem;color:#555;margin-bottom:4px;}"
+    ".form-group input,.form-group select{width:100%;padding:8px 10px;border:1px solid #ccc;border-radius:6px;}"
+    ".event-log{background:#f8f9fa;border:1px solid #dee2e6;border-radius:6px;padding:12px;max-height:280px;overflow-y:auto;}"
+    ".event-log ul{margin:0;padding-left:20px;}"
+    ".event-log li{margin:4px 0;font-size:0.9rem;color:#444;}"
+    ".event-log .meta{color:#666;font-size:0.8rem;}"
+    "</style>"
+    "</head><body><div class='app'>"
+    "<header><h1>Spokely Work Orders</h1></header>"
+)
+
+_ADD_FORM = (
+    "<div class='card'><h2>Add Work Order</h2>"
+    "<form method='post' action='/'>"
+    "<input type='hidden' name='action' value='add'>"
+    "<div class='form-row'>"
+    "<div class='form-group'><label>Customer</label><input type='text' name='customer' required></div>"
+    "<div class='form-group'><label>Item</label><input type='text' name='item' required></div>"
+    "<div class='form-group'><label>Total ($)</label><input type='number' name='total' step='0.01' value='0'></div>"
+    "<div class='form-group'><label>Status</label><select name='status'><option value='in progress' selected>in progress</option><option value='Finished'>Finished</option></select></div>"
+    "<div class='form-group'><label>&nbsp;</label><button type='submit' class='btn btn-primary'>Add Work Order</button></div>"
+    "</div></form></div>"
+)
+
+_FOOT = "</div></body></html>"
+
+
+# Rendered <tr> per work order id: id -> ((finished, customer, item, total), html).
+# A row is re-rendered only when one of the fields it shows has changed; it is rendered
+# from the key itself, so the cached HTML always matches the key it is stored under.
+_row_cache = {}
+
+
+def _row_key(wo):
+    """The fields a table row shows: (finished, customer, item, total)."""
+    return (wo["_finished"], wo.get("customer"), wo.get("item"), wo.get("total", 0))
+
+
+def _render_row(wid, key):
+    """Render one work order (given as its id and _row_key) as a table row."""
+    is_finished, customer, item, total = key
+    total_str = f"${total:.2f}" if isinstance(total, (int, float)) else str(total)
+    badge_class = "finished" if is_finished else "inprogress"
+    badge_text = "Finished" if is_finished else "In progress"
+    if not is_finished:
+        action = (
+            f"<form method='post' action='/' style='display:inline;'>"
+            f"<input type='hidden' name='action' value='mark_finished'><input type='hidden' name='workorder_id' value='{wid}'>"
+            f"<button type='submit' class='btn btn-primary btn-sm'>Mark Finished</button></form>"
+        )
+    else:
+        action = "—"
+    return (
+        f"<tr><td>{wid}</td><td>{_escape(customer)}</td><td>{_escape(item)}</td>"
+        f"<td><span class='badge {badge_class}'>{_escape(badge_text)}</span></td><td>{_escape(total_str)}</td><td>"
+        f"{action}</td></tr>"
+    )
+
+
+def _iter_page(work_orders, notified, recent_events):
+    """Yield the full HTML page (embedded CSS, header, form, table, banner, event log) in chunks,
+    one per table row, so the response streams instead of being built in memory first.
+    """
+    yield _HEAD
 
     # Notification banner
     if notified:
         lines = [f"Work order #{wid} ({_escape(customer)} – {_escape(item)}) marked finished; SMS simulated." for wid, customer, item in notified]
-        parts.append("<div class='banner'><strong>Notification:</strong> " + " ".join(lines) + "</div>")
+        yield "<div class='banner'><strong>Notification:</strong> " + " ".join(lines) + "</div>"
 
     # Add Work Order form
-    parts.append("<div class='card'><h2>Add Work Order</h2>")
-    parts.append("<form method='post' action='/'>")
-    parts.append("<input type='hidden' name='action' value='add'>")
-    parts.append("<div class='form-row'>")
-    parts.append("<div class='form-group'><label>Customer</label><input type='text' name='customer' required></div>")
-    parts.append("<div class='form-group'><label>Item</label><input type='text' name='item' required></div>")
-    parts.append("<div class='form-group'><label>Total ($)</label><input type='number' name='total' step='0.01' value='0'></div>")
-    parts.append("<div class='form-group'><label>Status</label><select name='status'><option value='in progress' selected>in progress</option><option value='Finished'>Finished</option></select></div>")
-    parts.append("<div class='form-group'><label>&nbsp;</label><button type='submit' class='btn btn-primary'>Add Work Order</button></div>")
-    parts.append("</div></form></div>")
+    yield _ADD_FORM
 
     # Work orders table
-    parts.append("<div class='card'><h2>Work Orders</h2>")
     if not work_orders:
-        parts.append("<p>No work orders yet. Add one above.</p>")
+        yield "<div class='card'><h2>Work Orders</h2><p>No work orders yet. Add one above.</p></div>"
     else:
-        parts.append("<table><thead><tr><th>ID</th><th>Customer</th><th>Item</th><th>Status</th><th>Total</th><th>Action</th></tr></thead><tbody>")
+        yield "<div class='card'><h2>Work Orders</h2><table><thead><tr><th>ID</th><th>Customer</th><th>Item</th><th>Status</th><th>Total</th><th>Action</th></tr></thead><tbody>"
         for wo in work_orders:
-            total = wo.get("total", 0)
-            total_str = f"${total:.2f}" if isinstance(total, (int, float)) else str(total)
-            status_val = (wo.get("status") or "").strip()
-            is_finished = _status_finished(status_val)
-            badge_class = "finished" if is_finished else "inprogress"
-            badge_text = "Finished" if is_finished else "In progress"
             wid = wo.get("id")
-            parts.append(
-                f"<tr><td>{wid}</td><td>{_escape(wo.get('customer'))}</td><td>{_escape(wo.get('item'))}</td>"
-                f"<td><span class='badge {badge_class}'>{_escape(badge_text)}</span></td><td>{_escape(total_str)}</td><td>"
-            )
-            if not is_finished:
-                parts.append(
-                    f"<form method='post' action='/' style='display:inline;'>"
-                    f"<input type='hidden' name='action' value='mark_finished'><input type='hidden' name='workorder_id' value='{wid}'>"
-                    f"<button type='submit' class='btn btn-primary btn-sm'>Mark Finished</button></form>"
-                )
-            else:
-                parts.append("—")
-            parts.append("</td></tr>")
-        parts.append("</tbody></table>")
-    parts.append("</div>")
+            key = _row_key(wo)
+            cached = _row_cache.get(wid)
+            if cached is not None and cached[0] == key:
+                yield cached[1]
+                continue
+            row = _render_row(wid, key)
+            _row_cache[wid] = (key, row)
+            yield row
+        yield "</tbody></table></div>"
 
     # Event log panel
-    parts.append("<div class='card'><h2>Event log (last 10)</h2><div class='event-log'>")
+    parts = ["<div class='card'><h2>Event log (last 10)</h2><div class='event-log'>"]
     if not recent_events:
         parts.append("<p>No events yet.</p>")
     else:
         parts.append("<ul>")
         for e in recent_events:
             parts.append(
-                f"<li><span class='meta'>{_escape(e.get('timestamp'))}</span> WO #{e.get('workorder_id')} "
+                f"<li><span class='meta'>{_escape(_format_timestamp(e.get('timestamp')))}</span> WO #{e.get('workorder_id')} "
                 f"{_escape(e.get('event_type'))}: {_escape(e.get('message'))}</li>"
             )
         parts.append("</ul>")
     parts.append("</div></div>")
-
-    parts.append("</div></body></html>")
-    return "".join(parts)
+    parts.append(_FOOT)
+    yield "".join(parts)
 
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    # Multi-threaded WSGI server instead of the single-threaded debug server.
+    # Keep to one process (e.g. gunicorn -w 1 -k gthread --threads 8 web_app:app):
+    # the caches and _mutation_lock are per-process.
+    from waitress import serve
+
+    serve(app, host="127.0.0.1", port=5000, threads=8)